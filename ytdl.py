@@ -1,17 +1,204 @@
 import sys
 import os
+import re
+import stat
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QPushButton, QLineEdit, QLabel, QComboBox, QTextEdit, QFileDialog,
-                            QProgressBar, QTabWidget, QMessageBox, QDesktopWidget)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QMutex, QTimer
+                            QProgressBar, QTabWidget, QMessageBox, QDesktopWidget, QCompleter)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QMutex, QTimer, QStringListModel
 from PyQt5.QtGui import QIcon, QClipboard, QTextCursor, QTextCharFormat, QColor
-import yt_dlp
 import shutil
 import socket
+import random
+import hashlib
+import json
+import time
+import threading
 from typing import List, Optional, Dict
 from datetime import datetime
 from enum import Enum
 from collections import OrderedDict
+from pathlib import Path
+from operator import itemgetter
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+_INVALID_URL_STYLE = "border: 1px solid red;"
+VIDEO_ONLY_SUFFIX = "_video_only"
+AUDIO_ONLY_SUFFIX = "_audio_only"
+MAX_LOG_LINES = 5000  # Baris log lama dibuang otomatis melewati batas ini
+CONCURRENT_FRAGMENTS = _env_int('YTDL_FRAGMENTS', 8)  # Jumlah fragmen HLS/DASH yang diunduh paralel oleh yt-dlp
+HTTP_CHUNK_SIZE = 10 * 1024 * 1024
+BUFFER_SIZE = 1024 * 1024
+LIST_CONCURRENCY = _env_int('YTDL_CONCURRENCY', 3)  # Jumlah video dari URL List yang diunduh bersamaan
+
+ABOUT_TEXT = """
+        YouTube Video Downloader v2.0
+        
+        Created by: Rofi (Fixploit03)
+        GitHub: https://github.com/fixploit03/ytdl
+        
+        This application allows you to download YouTube videos in various modes:
+        - Single URL: Download individual videos with customizable format options.
+        - URL List: Download multiple videos from a text file.
+        - Playlist: Download entire YouTube playlists.
+        
+        Requirements:
+        - Python 3.x
+        - PyQt5
+        - yt-dlp
+        - FFmpeg
+        
+        Support the Developer:
+        If you find this tool useful, consider supporting me:
+        - Donation: https://saweria.co/fixploit03
+        
+        Thank you for using YTDL!
+        """
+
+def _retry_backoff(n: int) -> float:
+    # Exponential backoff + jitter untuk retry HTTP/fragmen/extractor yt-dlp.
+    # yt-dlp memanggilnya dengan keyword: sleep_func(n=<retry ke-n, mulai 0>)
+    return min(2 ** n + random.uniform(0, 1), 30)
+
+# 'extractor': extractor_retries aktif secara default (3) dan tanpa jeda; ikut pakai backoff yang sama
+RETRY_SLEEP_FUNCTIONS = {'http': _retry_backoff, 'fragment': _retry_backoff, 'extractor': _retry_backoff}
+
+def find_ffmpeg() -> Optional[str]:
+    # FFMPEG_PATH dari environment diutamakan, lalu cari di PATH
+    env_path = os.environ.get('FFMPEG_PATH')
+    if env_path and os.path.isfile(env_path):
+        return env_path
+    return shutil.which("ffmpeg")
+
+# Dicari sekali saat impor; check_dependencies dan setiap unduhan memakai hasil yang sama
+FFMPEG_PATH = find_ffmpeg()
+
+# Utamakan H.264 (avc1) + audio m4a agar merge ke mp4 cukup remux tanpa re-encode
+_BEST_MP4 = 'bestvideo[vcodec^=avc1][ext=mp4]+bestaudio[ext=m4a]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]'
+_BASE_YDL_OPTS = {
+    'socket_timeout': 30,
+    # Lewat API default-nya 0 retry; di sini retry diaktifkan (3x) dengan jeda RETRY_SLEEP_FUNCTIONS
+    'retries': 3,
+    'fragment_retries': 3,
+    'merge_output_format': 'mp4',
+    'concurrent_fragment_downloads': CONCURRENT_FRAGMENTS,
+    'http_chunk_size': HTTP_CHUNK_SIZE,
+    'buffersize': BUFFER_SIZE,
+    'retry_sleep_functions': RETRY_SLEEP_FUNCTIONS,
+    'ffmpeg_location': FFMPEG_PATH,
+}
+
+_YT_RE = re.compile(r'^https?://(?:[\w-]+\.)*(?:youtube\.com|youtu\.be)(?::\d+)?(?:[/?#]|$)', re.IGNORECASE)
+# Versi multiline untuk memindai seluruh isi file URL sekaligus: satu URL per baris, spasi di tepi diabaikan.
+# Ekor URL greedy dan berakhir di non-spasi agar deretan spasi tidak di-scan ulang (tetap linear)
+_YT_LINE_RE = re.compile(r'^[^\S\n]*(https?://(?:[\w-]+\.)*(?:youtube\.com|youtu\.be)(?::\d+)?(?:[/?#](?:[^\n]*\S)?)?)[^\S\n]*$',
+                         re.IGNORECASE | re.MULTILINE)
+
+def is_valid_url(url: str) -> bool:
+    return isinstance(url, str) and _YT_RE.match(url) is not None
+
+NETWORK_CHECK_TTL = 30  # detik; hasil probe yang berhasil dipakai ulang selama jangka ini
+_last_network_check = {'ts': 0.0, 'ok': False}
+
+def check_network() -> bool:
+    if _last_network_check['ok'] and time.monotonic() - _last_network_check['ts'] < NETWORK_CHECK_TTL:
+        return True
+    try:
+        with socket.create_connection(("8.8.8.8", 53), timeout=2):
+            ok = True
+    except OSError:
+        ok = False
+    _last_network_check['ts'] = time.monotonic()
+    _last_network_check['ok'] = ok
+    return ok
+
+# Cache format di disk agar URL yang sama tidak perlu diekstrak ulang antar sesi (nonaktifkan dengan --no-cache)
+FORMAT_CACHE_PATH = Path.home() / '.ytdl_cache.json'
+FORMAT_CACHE_TTL = 3600  # detik
+USE_FORMAT_CACHE = True  # Dimatikan oleh opsi --no-cache di __main__
+
+def format_cache_key(url: str) -> str:
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+def is_fresh_cache_entry(entry) -> bool:
+    fetched = entry.get('fetched') if isinstance(entry, dict) else None
+    return isinstance(fetched, (int, float)) and time.time() - fetched < FORMAT_CACHE_TTL
+
+def load_format_cache() -> Dict[str, Dict]:
+    if not USE_FORMAT_CACHE:
+        return {}
+    try:
+        with open(FORMAT_CACHE_PATH, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(entries, dict):
+        return {}
+    return {key: entry for key, entry in entries.items() if is_fresh_cache_entry(entry)}
+
+def save_format_cache(entries: Dict[str, Dict]):
+    if not USE_FORMAT_CACHE:
+        return
+    try:
+        with open(FORMAT_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+    except OSError:
+        pass
+
+_validated_dirs: Dict[str, str] = {}
+
+def is_valid_location(location: str) -> Optional[str]:
+    # Mengembalikan path absolut yang sudah divalidasi (di-cache per input), atau None jika tidak valid
+    if not location:
+        return None
+    cached = _validated_dirs.get(location)
+    if cached is not None:
+        return cached
+    path = os.path.expanduser(location)
+    # Path absolut (misalnya dari dialog Browse) cukup dinormalisasi, tanpa getcwd atau resolusi symlink
+    path = os.path.normpath(path) if os.path.isabs(path) else os.path.abspath(path)
+    # Ejaan lain dari direktori yang sudah divalidasi (misalnya dengan '/' di akhir) tidak perlu di-stat lagi
+    if path in _validated_dirs:
+        _validated_dirs[location] = path
+        return path
+    # Satu stat: hanya folder yang sudah ada yang diterima (path yang hilang tidak dibuat)
+    try:
+        if not stat.S_ISDIR(os.stat(path).st_mode):
+            return None
+    except OSError:
+        return None
+    _validated_dirs[location] = _validated_dirs[path] = path
+    return path
+
+_NO_CODEC = frozenset({None, '', 'none'})
+_NO_CANDIDATE = (-1, None)
+
+_VIDEO_FIELDS = itemgetter('vcodec', 'height', 'filesize', 'format_id')
+
+def _video_fields(f: Dict) -> tuple:
+    # Jalur cepat: satu panggilan C untuk semua key; fallback ke .get() jika ada key yang hilang
+    try:
+        vcodec, height, filesize, format_id = _VIDEO_FIELDS(f)
+    except KeyError:
+        get = f.get
+        vcodec, height, filesize, format_id = get('vcodec'), get('height'), get('filesize'), get('format_id')
+    return vcodec, height, filesize or 0, format_id
+
+def best_formats_by_height(formats: List[Dict]) -> List[tuple]:
+    # Satu pass: format mp4 dengan ukuran file terbesar per resolusi, hasil (height, format_id) urut menurun
+    best_by_height: Dict[int, tuple] = {}
+    for f in formats:
+        if f.get('ext') != 'mp4':
+            continue
+        vcodec, height, filesize, format_id = _video_fields(f)
+        if vcodec not in _NO_CODEC and height is not None and filesize > best_by_height.get(height, _NO_CANDIDATE)[0]:
+            best_by_height[height] = (filesize, format_id)
+    return [(height, format_id) for height, (_, format_id) in sorted(best_by_height.items(), reverse=True)]
 
 # Enum for download modes
 class DownloadMode(Enum):
@@ -19,6 +206,23 @@ class DownloadMode(Enum):
     LIST = "list"
     PLAYLIST = "playlist"
 
+def _is_url_file(path: str) -> bool:
+    return bool(path) and os.path.isfile(path)
+
+# Template nama file output per mode, relatif terhadap lokasi simpan
+_OUTPUT_TEMPLATES = {
+    DownloadMode.SINGLE: '%(title)s.%(ext)s',
+    DownloadMode.LIST: '%(title)s.%(ext)s',
+    DownloadMode.PLAYLIST: '%(playlist_title)s/%(title)s.%(ext)s',
+}
+
+# Validator input dan pesan error untuk setiap mode unduhan
+_INPUT_VALIDATORS = {
+    DownloadMode.SINGLE: (is_valid_url, "Invalid YouTube URL. Please enter a valid URL to start the download."),
+    DownloadMode.LIST: (_is_url_file, "Invalid URL file. Please select a valid file to start the batch download."),
+    DownloadMode.PLAYLIST: (is_valid_url, "Invalid playlist URL. Please enter a valid URL to start the download."),
+}
+
 class DownloadWorker(QThread):
     progress = pyqtSignal(str)
     finished = pyqtSignal(bool)
@@ -30,14 +234,19 @@ class DownloadWorker(QThread):
         self.mode = mode.value
         self.url_or_file = url_or_file
         self.save_location = save_location
+        # save_location sudah absolut (lihat is_valid_location), jadi template cukup digabung sekali
+        self.outtmpl = os.path.join(save_location, _OUTPUT_TEMPLATES[mode])
         self.format_id = format_id
         self._running = True
         self.last_progress_message = ""
+        self._last_percent = -1
+        # URL List diunduh paralel, jadi progress bar menunjukkan jumlah video selesai, bukan per file
+        self._per_file_progress = mode != DownloadMode.LIST
     
     def run(self):
         try:
             self._mutex.lock()
-            if not self.check_network():
+            if not check_network():
                 self.progress.emit("No internet connection detected. Please check your network and try again.")
                 self.finished.emit(False)
                 return
@@ -60,39 +269,41 @@ class DownloadWorker(QThread):
         self._running = False
         self.progress.emit("Download stopped by user.")
     
-    def check_network(self) -> bool:
-        try:
-            socket.create_connection(("8.8.8.8", 53), timeout=5)
-            return True
-        except (socket.gaierror, socket.timeout, OSError):
-            return False
-    
     def progress_hook(self, d):
         try:
             if not self._running:
                 return
+            if not self._per_file_progress:
+                if d['status'] == 'finished':
+                    self.progress.emit("Download completed successfully!")
+                return
             if d['status'] == 'downloading':
-                percent = d.get('_percent_str', '0%').strip('%')
-                try:
-                    self.percentage.emit(int(float(percent)))  # Kirim persentase ke progress bar
-                except ValueError:
-                    pass
+                total = d.get('total_bytes') or d.get('total_bytes_estimate')
+                if total:
+                    percent = int(d.get('downloaded_bytes', 0) * 100 / total)
+                    # Hook dipanggil per chunk; kirim sinyal hanya saat persentase berubah
+                    if percent != self._last_percent:
+                        self._last_percent = percent
+                        self.percentage.emit(percent)  # Kirim persentase ke progress bar
             elif d['status'] == 'finished':
                 self.progress.emit("Download completed successfully!")
                 self.progress.emit(f"File saved to: {self.save_location}")
+                self._last_percent = 100
                 self.percentage.emit(100)
         except KeyError as e:
             self.progress.emit(f"Error updating progress: Missing key '{str(e)}'. Please try again.")
     
     def download_single(self):
+        import yt_dlp  # Impor lambat: ratusan modul extractor, tidak perlu saat startup
         try:
-            is_audio_only = "audio_only" in self.format_id
-            is_video_only = "video_only" in self.format_id
-            base_format_id = self.format_id.replace("_video_only", "").replace("_audio_only", "") if self.format_id != "best" else self.format_id
+            # Mode dikodekan sebagai akhiran format_id dari combo; cukup cek akhiran sekali lalu potong
+            is_audio_only = self.format_id.endswith(AUDIO_ONLY_SUFFIX)
+            is_video_only = self.format_id.endswith(VIDEO_ONLY_SUFFIX)
+            base_format_id = self.format_id[:-len(VIDEO_ONLY_SUFFIX)] if is_video_only else self.format_id
 
             ydl_opts = {
-                'outtmpl': os.path.join(self.save_location, '%(title)s.%(ext)s'),
-                'socket_timeout': 30,
+                **_BASE_YDL_OPTS,
+                'outtmpl': self.outtmpl,
                 'progress_hooks': [self.progress_hook],
                 'noplaylist': True,
             }
@@ -108,23 +319,21 @@ class DownloadWorker(QThread):
                 })
                 self.progress.emit("Downloading audio only...")
             elif is_video_only:
-                ydl_opts.update({
-                    'format': base_format_id,
-                    'merge_output_format': 'mp4',
-                })
+                ydl_opts['format'] = base_format_id
                 self.progress.emit("Downloading video only (without audio)...")
             else:
-                ydl_opts.update({
-                    'format': 'bestvideo[ext=mp4]+bestaudio[ext=mp4]/best[ext=mp4]' if base_format_id == 'best' else f"{base_format_id}+bestaudio[ext=mp4]/best[ext=mp4]",
-                    'merge_output_format': 'mp4',
-                })
+                ydl_opts['format'] = _BEST_MP4 if base_format_id == 'best' else f"{base_format_id}+bestaudio[ext=m4a]/best[ext=mp4]"
                 self.progress.emit("Downloading video with audio...")
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url_or_file, download=False)
+                info = ydl.extract_info(self.url_or_file, download=False, process=False)
+                if info.get('_type', 'video') != 'video':
+                    # Hasil redirect (mis. watch?v=X&list=Y) belum punya judul; resolve penuh seperti sebelumnya
+                    info = ydl.process_ie_result(info, download=False)
                 title = info.get('title', 'Unknown Title')
                 self.progress.emit(f"Starting download for: '{title}'")
-                ydl.download([self.url_or_file])
+                # Seleksi format dan unduhan dijalankan sekali di sini, memakai info mentah di atas
+                ydl.process_ie_result(info, download=True)
             self.finished.emit(True)
         except yt_dlp.utils.DownloadError as e:
             self.progress.emit(f"Download failed: {str(e)}. Please verify the URL or check your internet connection.")
@@ -137,6 +346,8 @@ class DownloadWorker(QThread):
             self.finished.emit(False)
     
     def download_list(self):
+        import yt_dlp
+        from concurrent.futures import ThreadPoolExecutor, as_completed  # Hanya dibutuhkan mode URL List
         try:
             urls = self.read_url_file()
             if not urls:
@@ -146,25 +357,52 @@ class DownloadWorker(QThread):
                 
             self.progress.emit(f"Found {len(urls)} URLs in the file. Starting batch download...")
             ydl_opts = {
-                'format': 'bestvideo[ext=mp4]+bestaudio[ext=mp4]/best[ext=mp4]',
-                'outtmpl': os.path.join(self.save_location, '%(title)s.%(ext)s'),
-                'merge_output_format': 'mp4',
-                'socket_timeout': 30,
+                **_BASE_YDL_OPTS,
+                'format': _BEST_MP4,
+                'outtmpl': self.outtmpl,
                 'progress_hooks': [self.progress_hook],
                 'noplaylist': True,
             }
             
-            success = True
-            for i, url in enumerate(urls, 1):
+            total = len(urls)
+            local = threading.local()
+            instances = []
+            instances_lock = threading.Lock()
+            
+            def download_one(i: int, url: str) -> bool:
                 if not self._running:
-                    break
-                self.progress.emit(f"Downloading video {i} of {len(urls)}: {url}")
+                    return True
+                self.progress.emit(f"Downloading video {i} of {total}: {url}")
                 try:
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        ydl.download([url])
+                    # YoutubeDL tidak thread-safe: satu instance per thread, dipakai ulang untuk URL berikutnya
+                    ydl = getattr(local, 'ydl', None)
+                    if ydl is None:
+                        # YoutubeDL.__init__ mengubah params in-place, jadi tiap thread dapat salinan sendiri
+                        ydl = local.ydl = yt_dlp.YoutubeDL(dict(ydl_opts))
+                        with instances_lock:
+                            instances.append(ydl)
+                    ydl.download([url])
+                    return True
                 except yt_dlp.utils.DownloadError as e:
                     self.progress.emit(f"Failed to download {url}: {str(e)}. Skipping to the next URL...")
-                    success = False
+                    return False
+                except Exception as e:
+                    # Error lain (izin, disk, dsb.) juga ditangani per URL agar tidak menggagalkan seluruh batch
+                    self.progress.emit(f"An error occurred while downloading {url}: {str(e)}. Skipping to the next URL...")
+                    return False
+            
+            success = True
+            completed = 0
+            try:
+                with ThreadPoolExecutor(max_workers=min(LIST_CONCURRENCY, total)) as executor:
+                    futures = [executor.submit(download_one, i, url) for i, url in enumerate(urls, 1)]
+                    for future in as_completed(futures):
+                        success = future.result() and success
+                        completed += 1
+                        self.percentage.emit(completed * 100 // total)
+            finally:
+                for ydl in instances:
+                    ydl.close()
             if success:
                 self.progress.emit("All videos in the list downloaded successfully!")
             else:
@@ -175,20 +413,21 @@ class DownloadWorker(QThread):
             self.finished.emit(False)
     
     def download_playlist(self):
+        import yt_dlp
         try:
             ydl_opts = {
-                'format': 'bestvideo[ext=mp4]+bestaudio[ext=mp4]/best[ext=mp4]',
-                'outtmpl': os.path.join(self.save_location, '%(playlist_title)s/%(title)s.%(ext)s'),
-                'merge_output_format': 'mp4',
-                'socket_timeout': 30,
+                **_BASE_YDL_OPTS,
+                'format': _BEST_MP4,
+                'outtmpl': self.outtmpl,
                 'progress_hooks': [self.progress_hook],
                 'noplaylist': False,
             }
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url_or_file, download=False)
+                # process=False: hanya metadata playlist, tiap video di-resolve sekali saat diunduh
+                info = ydl.extract_info(self.url_or_file, download=False, process=False)
                 playlist_title = info.get('title', 'Unknown Playlist')
                 self.progress.emit(f"Starting download for playlist: '{playlist_title}'")
-                ydl.download([self.url_or_file])
+                ydl.process_ie_result(info, download=True)
             self.finished.emit(True)
         except yt_dlp.utils.DownloadError as e:
             self.progress.emit(f"Playlist download failed: {str(e)}. Please verify the URL or check your internet connection.")
@@ -201,14 +440,11 @@ class DownloadWorker(QThread):
             self.finished.emit(False)
     
     def read_url_file(self) -> List[str]:
-        urls = []
         try:
             self.progress.emit(f"Reading URL file: '{self.url_or_file}'")
             with open(self.url_or_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    url = line.strip()
-                    if url and self.is_valid_url(url):
-                        urls.append(url)
+                data = f.read()
+            urls = _YT_LINE_RE.findall(data)
             if not urls:
                 self.progress.emit("No valid YouTube URLs found in the file.")
             return urls
@@ -225,12 +461,46 @@ class DownloadWorker(QThread):
             self.progress.emit(f"Error reading file: {str(e)}. Please try again.")
             return []
     
-    def is_valid_url(self, url: str) -> bool:
+class FormatWorker(QThread):
+    formats_ready = pyqtSignal(str, list)
+    error = pyqtSignal(str)
+    _mutex = QMutex()
+    _ydl = None  # Instance YoutubeDL bersama, dipakai ulang untuk setiap pengambilan format
+    
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+    
+    def run(self):
         try:
-            youtube_domains = ["youtube.com", "youtu.be"]
-            return url.startswith(("http://", "https://")) and any(domain in url.lower() for domain in youtube_domains)
-        except AttributeError:
-            return False
+            self._mutex.lock()
+            # Impor di dalam try: exception yang lolos dari QThread.run membuat PyQt5 meng-abort aplikasi
+            import yt_dlp
+            if FormatWorker._ydl is None:
+                FormatWorker._ydl = yt_dlp.YoutubeDL({
+                    'quiet': True,
+                    'no_warnings': True,
+                    'noplaylist': True,
+                    # Lewati manifest HLS: formatnya tanpa filesize dan tidak pernah dipilih di atas DASH
+                    'extractor_args': {'youtube': {'skip': ['hls']}},
+                })
+            # process=False: hanya butuh metadata format mentah, tanpa seleksi/pengurutan format
+            info = FormatWorker._ydl.extract_info(self.url, download=False, process=False)
+            if info.get('_type', 'video') != 'video':
+                # Hasil redirect (mis. watch?v=X&list=Y) belum berisi formats; resolve seperti di download_single
+                info = FormatWorker._ydl.process_ie_result(info, download=False)
+            # Reduksi dilakukan di thread ini; yang disimpan dan dikirim hanya pasangan (height, format_id)
+            resolutions = best_formats_by_height(info.get('formats') or [])
+            del info
+            self.formats_ready.emit(self.url, resolutions)
+        except ImportError as e:
+            self.error.emit(f"Failed to load yt-dlp: {str(e)}. Please install it with 'pip install yt-dlp'.")
+        except yt_dlp.utils.DownloadError as e:
+            self.error.emit(f"Failed to fetch formats: {str(e)}. Please check the URL or your internet connection.")
+        except Exception as e:
+            self.error.emit(f"Error fetching formats: {str(e)}. Please try again.")
+        finally:
+            self._mutex.unlock()
 
 class YTDLWindow(QMainWindow):
     def __init__(self):
@@ -247,8 +517,10 @@ class YTDLWindow(QMainWindow):
             print(f"Warning: Could not load icon: {str(e)}")
         
         self.worker = None
+        self.format_worker = None
         self.format_cache = OrderedDict()
         self.max_cache_size = 50
+        self.disk_format_cache = load_format_cache()
         
         try:
             self.central_widget = QWidget()
@@ -281,6 +553,15 @@ class YTDLWindow(QMainWindow):
             self.download_layout.addWidget(self.log_label)
             self.log_output = QTextEdit()
             self.log_output.setReadOnly(True)
+            self.log_output.document().setMaximumBlockCount(MAX_LOG_LINES)
+            self.log_format = QTextCharFormat()
+            self.log_format.setForeground(QColor("black"))
+            # Pesan log dikumpulkan lalu ditulis sekaligus sekali per putaran event loop
+            self._pending_log = []
+            self._log_flush_timer = QTimer(self)
+            self._log_flush_timer.setSingleShot(True)
+            self._log_flush_timer.setInterval(0)
+            self._log_flush_timer.timeout.connect(self._flush_log)
             self.download_layout.addWidget(self.log_output)
             
             self.check_dependencies()
@@ -308,18 +589,21 @@ class YTDLWindow(QMainWindow):
         if self.worker and self.worker.isRunning():
             self.worker.stop()
             self.worker.wait()
+        if self.format_worker and self.format_worker.isRunning():
+            self.format_worker.wait()
+        # Instance bersama ditutup sekali di sini agar cookie jar disimpan dan request handler dibersihkan
+        if FormatWorker._ydl is not None:
+            FormatWorker._ydl.close()
+            FormatWorker._ydl = None
         self.append_log("Application closed. Thank you for using YTDL!")
         event.accept()
     
     def check_dependencies(self):
-        try:
-            if not shutil.which("ffmpeg"):
-                self.append_log("FFmpeg is not installed. Please install FFmpeg to enable downloading.")
-                self.single_download_btn.setEnabled(False)
-                self.list_download_btn.setEnabled(False)
-                self.playlist_download_btn.setEnabled(False)
-        except Exception as e:
-            self.append_log(f"Error checking dependencies: {str(e)}. Please ensure FFmpeg is installed correctly.")
+        if not FFMPEG_PATH:
+            self.append_log("FFmpeg is not installed. Please install FFmpeg to enable downloading.")
+            self.single_download_btn.setEnabled(False)
+            self.list_download_btn.setEnabled(False)
+            self.playlist_download_btn.setEnabled(False)
     
     def setup_download_tab(self):
         self.download_sub_tabs = QTabWidget()
@@ -339,6 +623,18 @@ class YTDLWindow(QMainWindow):
         self.playlist_layout = QVBoxLayout(self.playlist_tab)
         self.setup_playlist_tab()
         self.download_sub_tabs.addTab(self.playlist_tab, "Playlist")
+        
+        self.url_download_buttons = {
+            self.single_url_input: self.single_download_btn,
+            self.playlist_url_input: self.playlist_download_btn,
+        }
+        
+        # Riwayat URL untuk auto-complete, dipakai bersama oleh field Single dan Playlist
+        self.url_history_model = QStringListModel()
+        for field in self.url_download_buttons:
+            completer = QCompleter(self.url_history_model, field)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            field.setCompleter(completer)
     
     def setup_single_tab(self):
         url_layout = QHBoxLayout()
@@ -424,29 +720,7 @@ class YTDLWindow(QMainWindow):
     def setup_about_tab(self):
         about_text = QTextEdit()
         about_text.setReadOnly(True)
-        about_text.setText("""
-        YouTube Video Downloader v2.0
-        
-        Created by: Rofi (Fixploit03)
-        GitHub: https://github.com/fixploit03/ytdl
-        
-        This application allows you to download YouTube videos in various modes:
-        - Single URL: Download individual videos with customizable format options.
-        - URL List: Download multiple videos from a text file.
-        - Playlist: Download entire YouTube playlists.
-        
-        Requirements:
-        - Python 3.x
-        - PyQt5
-        - yt-dlp
-        - FFmpeg
-        
-        Support the Developer:
-        If you find this tool useful, consider supporting me:
-        - Donation: https://saweria.co/fixploit03
-        
-        Thank you for using YTDL!
-        """)
+        about_text.setPlainText(ABOUT_TEXT)
         self.about_layout.addWidget(about_text)
     
     def paste_url(self, input_field: QLineEdit):
@@ -486,81 +760,94 @@ class YTDLWindow(QMainWindow):
     def get_formats(self):
         try:
             url = self.single_url_input.text().strip()
-            if not self.is_valid_url(url):
+            if not is_valid_url(url):
                 self.append_log("Invalid YouTube URL. Please enter a valid URL to fetch formats.")
                 return
+            # Dicatat di riwayat untuk semua jalur: cache memori, cache disk, maupun fetch jaringan
+            self.remember_url(url)
                 
             if url in self.format_cache:
                 self._populate_format_combo(self.format_cache[url])
                 self.append_log(f"Loaded formats from cache for: '{url}'")
                 return
+            entry = self.disk_format_cache.get(format_cache_key(url))
+            if is_fresh_cache_entry(entry) and 'resolutions' in entry:
+                self._cache_formats(url, entry['resolutions'])
+                self._populate_format_combo(entry['resolutions'])
+                self.append_log(f"Loaded formats from disk cache for: '{url}'")
+                return
+                
+            if self.format_worker and self.format_worker.isRunning():
+                self.append_log("Formats are already being fetched. Please wait.")
+                return
                 
             self.append_log(f"Fetching available formats for: '{url}'...")
-            ydl_opts = {'quiet': True, 'no_warnings': True}
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                formats = info.get('formats', [])
-                if len(self.format_cache) >= self.max_cache_size:
-                    self.format_cache.popitem(last=False)
-                self.format_cache[url] = formats
-                self._populate_format_combo(formats)
-        except yt_dlp.utils.DownloadError as e:
-            self.append_log(f"Failed to fetch formats: {str(e)}. Please check the URL or your internet connection.")
+            self.get_formats_btn.setEnabled(False)
+            # Ekstraksi berjalan di thread terpisah agar GUI tetap responsif
+            self.format_worker = FormatWorker(url)
+            self.format_worker.formats_ready.connect(self.formats_fetched)
+            self.format_worker.error.connect(self.append_log)
+            self.format_worker.finished.connect(lambda: self.get_formats_btn.setEnabled(True))
+            self.format_worker.start()
         except Exception as e:
             self.append_log(f"Error fetching formats: {str(e)}. Please try again.")
     
-    def _populate_format_combo(self, formats: List[Dict]):
-        self.format_combo.clear()
-        self.format_combo.addItem("Video + Audio (Best Quality)", "best")
-        
-        resolution_dict: Dict[str, Dict[str, Optional[int]]] = {}
-        for f in formats:
-            if f.get('ext') == 'mp4' and f.get('vcodec') != 'none':
-                resolution = f.get('height')
-                filesize = f.get('filesize')
-                if resolution is not None:
-                    res_str = f"{resolution}p"
-                    format_id = f.get('format_id')
-                    filesize = filesize if filesize is not None else 0
-                    if res_str not in resolution_dict or filesize > (resolution_dict[res_str]['filesize'] or 0):
-                        resolution_dict[res_str] = {'format_id': format_id, 'filesize': filesize}
-        
-        video_audio_formats = []
-        video_only_formats = []
-        
-        for res in sorted(resolution_dict.keys(), key=lambda x: int(x[:-1]), reverse=True):
-            format_id = resolution_dict[res]['format_id']
-            video_audio_formats.append((f"Video + Audio ({res})", format_id))
-            video_only_formats.append((f"Video Only ({res})", f"{format_id}_video_only"))
-        
-        for label, format_id in video_audio_formats:
-            self.format_combo.addItem(label, format_id)
-        for label, format_id in video_only_formats:
-            self.format_combo.addItem(label, format_id)
-        
-        self.format_combo.addItem("Audio Only (Best Quality)", "bestaudio_audio_only")
+    def _cache_formats(self, url: str, resolutions: List[tuple]):
+        if len(self.format_cache) >= self.max_cache_size:
+            self.format_cache.popitem(last=False)
+        self.format_cache[url] = resolutions
+    
+    def formats_fetched(self, url: str, resolutions: List[tuple]):
+        # Hasil kosong tidak di-cache agar fetch berikutnya bisa mencoba lagi
+        if resolutions:
+            self._cache_formats(url, resolutions)
+            self.disk_format_cache[format_cache_key(url)] = {'fetched': time.time(), 'resolutions': resolutions}
+            save_format_cache(self.disk_format_cache)
+        # URL bisa diubah selama fetch berjalan; format URL lama hanya di-cache, tidak dimuat ke combo
+        if url == self.single_url_input.text().strip():
+            self._populate_format_combo(resolutions)
+    
+    def _populate_format_combo(self, resolutions: List[tuple]):
+        # Tunda repaint dan sinyal combo sampai semua item selesai ditambahkan
+        self.format_combo.setUpdatesEnabled(False)
+        self.format_combo.blockSignals(True)
+        try:
+            self.format_combo.clear()
+            self.format_combo.addItem("Video + Audio (Best Quality)", "best")
+            
+            for height, format_id in resolutions:
+                self.format_combo.addItem(f"Video + Audio ({height}p)", format_id)
+            for height, format_id in resolutions:
+                self.format_combo.addItem(f"Video Only ({height}p)", format_id + VIDEO_ONLY_SUFFIX)
+            
+            self.format_combo.addItem("Audio Only (Best Quality)", "bestaudio" + AUDIO_ONLY_SUFFIX)
+        finally:
+            self.format_combo.blockSignals(False)
+            self.format_combo.setUpdatesEnabled(True)
         total_formats = self.format_combo.count()
         self.append_log(f"Successfully loaded {total_formats} format options.")
     
-    def is_valid_url(self, url: str) -> bool:
-        try:
-            youtube_domains = ["youtube.com", "youtu.be"]
-            return url.startswith(("http://", "https://")) and any(domain in url.lower() for domain in youtube_domains)
-        except AttributeError:
-            self.append_log("URL validation error: Invalid URL format. Please enter a valid URL.")
-            return False
+    def remember_url(self, url: str):
+        urls = self.url_history_model.stringList()
+        if urls and urls[0] == url:
+            return
+        if url in urls:
+            urls.remove(url)
+        urls.insert(0, url)
+        self.url_history_model.setStringList(urls[:self.max_cache_size])
     
     def validate_url(self, text: str):
-        if not self.is_valid_url(text):
-            self.single_url_input.setStyleSheet("border: 1px solid red;" if self.single_url_input.text() == text else "")
-            self.playlist_url_input.setStyleSheet("border: 1px solid red;" if self.playlist_url_input.text() == text else "")
-            self.single_download_btn.setEnabled(False)
-            self.playlist_download_btn.setEnabled(False)
-        else:
-            self.single_url_input.setStyleSheet("")
-            self.playlist_url_input.setStyleSheet("")
-            self.single_download_btn.setEnabled(True)
-            self.playlist_download_btn.setEnabled(True)
+        # Dipanggil setiap ketikan: hanya perbarui field pengirim, dan hanya jika statusnya berubah
+        field = self.sender()
+        button = self.url_download_buttons.get(field)
+        if button is None:
+            return
+        valid = is_valid_url(text)
+        style = "" if valid else _INVALID_URL_STYLE
+        if field.styleSheet() != style:
+            field.setStyleSheet(style)
+        if button.isEnabled() != valid:
+            button.setEnabled(valid)
     
     def start_download(self, mode: DownloadMode, url_or_file: str, save_location: str, button: QPushButton):
         try:
@@ -568,19 +855,18 @@ class YTDLWindow(QMainWindow):
                 self.append_log("A download is already in progress. Please wait or stop the current download.")
                 return
                 
-            if mode == DownloadMode.SINGLE and not self.is_valid_url(url_or_file):
-                self.append_log("Invalid YouTube URL. Please enter a valid URL to start the download.")
-                return
-            if mode == DownloadMode.LIST and (not url_or_file or not os.path.isfile(url_or_file)):
-                self.append_log("Invalid URL file. Please select a valid file to start the batch download.")
-                return
-            if mode == DownloadMode.PLAYLIST and not self.is_valid_url(url_or_file):
-                self.append_log("Invalid playlist URL. Please enter a valid URL to start the download.")
+            validator, error_message = _INPUT_VALIDATORS[mode]
+            if not validator(url_or_file):
+                self.append_log(error_message)
                 return
-            if not save_location or not os.path.isdir(save_location):
+            save_location = is_valid_location(save_location)
+            if not save_location:
                 self.append_log("Invalid save location. Please select a valid directory before starting the download.")
                 return
                 
+            if mode != DownloadMode.LIST:
+                self.remember_url(url_or_file)
+                
             format_id = self.format_combo.currentData() if mode == DownloadMode.SINGLE else "best"
             format_text = self.format_combo.currentText() if mode == DownloadMode.SINGLE else "Best Quality"
             self.append_log(f"Starting {mode.value} download.... Format: {format_text}")
@@ -610,26 +896,31 @@ class YTDLWindow(QMainWindow):
     def append_log(self, message: str):
         try:
             current_time = datetime.now().strftime("%H:%M:%S")
-            log_message = f"[{current_time}] {message}"
-            format = QTextCharFormat()
-            format.setForeground(QColor("black"))
+            self._pending_log.append(f"[{current_time}] {message}")
+            if not self._log_flush_timer.isActive():
+                self._log_flush_timer.start()
+        except Exception as e:
+            print(f"Warning: Failed to append log: {str(e)}")
+    
+    def _flush_log(self):
+        try:
+            if not self._pending_log:
+                return
+            log_messages = "\n".join(self._pending_log)
+            self._pending_log.clear()
             cursor = self.log_output.textCursor()
             cursor.movePosition(QTextCursor.End)
             self.log_output.setTextCursor(cursor)
-            self.log_output.setCurrentCharFormat(format)
-            QTimer.singleShot(0, lambda: self.log_output.append(log_message))
-            QTimer.singleShot(0, lambda: self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum()))
+            self.log_output.setCurrentCharFormat(self.log_format)
+            self.log_output.append(log_messages)
+            scroll_bar = self.log_output.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
         except Exception as e:
             print(f"Warning: Failed to append log: {str(e)}")
     
     def update_progress(self, message: str):
-        try:
-            if "Download completed successfully!" in message:
-                self.append_log(message)
-            elif "Downloading:" not in message:
-                self.append_log(message)
-        except Exception as e:
-            self.append_log(f"Unexpected error updating progress: {str(e)}. Please try again.")
+        if "Downloading:" not in message:
+            self.append_log(message)
     
     def update_progress_bar(self, percent: int):
         self.progress_bar.setValue(percent)
@@ -648,6 +939,10 @@ class YTDLWindow(QMainWindow):
 
 if __name__ == '__main__':
     try:
+        # Opsi milik aplikasi diambil dulu agar tidak ikut diteruskan ke QApplication
+        if '--no-cache' in sys.argv:
+            sys.argv.remove('--no-cache')
+            USE_FORMAT_CACHE = False
         app = QApplication(sys.argv)
         window = YTDLWindow()
         window.show()